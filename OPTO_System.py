@@ -5,6 +5,13 @@ import time
 import ctypes
 import json
 import shutil
+import threading
+import ast
+import functools
+import importlib
+import importlib.machinery
+import importlib.util
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 
 # Auto-install required dependencies before importing them
@@ -38,8 +45,609 @@ import pygame
 import psutil
 from packaging import requirements
 
+class OPTOMetrics:
+    """In-memory ritual and host metrics, rendered in Prometheus text format"""
+    DURATION_BUCKETS = (1, 5, 15, 60, 300, 900, 1800, 3600)
+
+    def __init__(self, sample_interval=5, disk_path=None):
+        self.lock = threading.Lock()
+        self.sample_interval = sample_interval
+        self.disk_path = disk_path or os.path.abspath(os.sep)
+        self.ritual_runs = {}       # (ritual, outcome) -> count
+        self.ritual_durations = {}  # ritual -> [bucket counts..., sum, count]
+        self.command_exits = {}     # (command, code) -> count
+        self.dns_changes = {}       # mode -> count
+        self.host_gauges = {}       # metric name -> value, refreshed by the sampler
+        self.server = None
+        self.stop_event = threading.Event()
+        self.threads = []
+
+    def record_ritual(self, ritual, duration, outcome="success"):
+        """Count a finished ritual and add its duration to the histogram"""
+        with self.lock:
+            key = (ritual, outcome)
+            self.ritual_runs[key] = self.ritual_runs.get(key, 0) + 1
+            entry = self.ritual_durations.get(ritual)
+            if entry is None:
+                entry = [0] * len(self.DURATION_BUCKETS) + [0.0, 0]
+                self.ritual_durations[ritual] = entry
+            for i, bound in enumerate(self.DURATION_BUCKETS):
+                if duration <= bound:
+                    entry[i] += 1
+            entry[-2] += duration
+            entry[-1] += 1
+
+    def record_command(self, command, code):
+        """Count a command exit code (or 'timeout' / 'error' when it never finished)"""
+        with self.lock:
+            key = (os.path.basename(str(command)).lower(), str(code))
+            self.command_exits[key] = self.command_exits.get(key, 0) + 1
+
+    def record_dns_change(self, mode):
+        """Count a successful DNS reconfiguration"""
+        with self.lock:
+            self.dns_changes[mode] = self.dns_changes.get(mode, 0) + 1
+
+    def sample_host(self):
+        """Refresh psutil host gauges - runs on the sampler thread, never on a scrape"""
+        gauges = {}
+        try:
+            gauges["opto_host_cpu_percent"] = psutil.cpu_percent(interval=None)
+            memory = psutil.virtual_memory()
+            gauges["opto_host_memory_percent"] = memory.percent
+            gauges["opto_host_memory_used_bytes"] = memory.used
+            disk = psutil.disk_usage(self.disk_path)
+            gauges["opto_host_disk_percent"] = disk.percent
+            gauges["opto_host_disk_free_bytes"] = disk.free
+            net = psutil.net_io_counters()
+            gauges["opto_host_network_sent_bytes_total"] = net.bytes_sent
+            gauges["opto_host_network_received_bytes_total"] = net.bytes_recv
+            gauges["opto_host_boot_time_seconds"] = psutil.boot_time()
+        except Exception:
+            pass
+        with self.lock:
+            self.host_gauges.update(gauges)
+
+    def sampler_loop(self):
+        """Periodically refresh host gauges until stopped"""
+        while not self.stop_event.is_set():
+            self.sample_host()
+            self.stop_event.wait(self.sample_interval)
+
+    @staticmethod
+    def escape(value):
+        """Escape a label value for the Prometheus text format"""
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    def render(self):
+        """Render all metrics in Prometheus text exposition format"""
+        with self.lock:
+            runs = dict(self.ritual_runs)
+            durations = {name: list(entry) for name, entry in self.ritual_durations.items()}
+            exits = dict(self.command_exits)
+            dns = dict(self.dns_changes)
+            host = dict(self.host_gauges)
+
+        lines = [
+            "# HELP opto_ritual_runs_total Rituals performed, by outcome.",
+            "# TYPE opto_ritual_runs_total counter",
+        ]
+        for (ritual, outcome), count in sorted(runs.items()):
+            lines.append(f'opto_ritual_runs_total{{ritual="{self.escape(ritual)}",outcome="{outcome}"}} {count}')
+
+        lines.append("# HELP opto_ritual_duration_seconds Ritual wall-clock duration.")
+        lines.append("# TYPE opto_ritual_duration_seconds histogram")
+        for ritual, entry in sorted(durations.items()):
+            label = self.escape(ritual)
+            for bound, count in zip(self.DURATION_BUCKETS, entry):
+                lines.append(f'opto_ritual_duration_seconds_bucket{{ritual="{label}",le="{bound}"}} {count}')
+            lines.append(f'opto_ritual_duration_seconds_bucket{{ritual="{label}",le="+Inf"}} {entry[-1]}')
+            lines.append(f'opto_ritual_duration_seconds_sum{{ritual="{label}"}} {entry[-2]}')
+            lines.append(f'opto_ritual_duration_seconds_count{{ritual="{label}"}} {entry[-1]}')
+
+        lines.append("# HELP opto_command_exits_total System command exit codes.")
+        lines.append("# TYPE opto_command_exits_total counter")
+        for (command, code), count in sorted(exits.items()):
+            lines.append(f'opto_command_exits_total{{command="{self.escape(command)}",code="{self.escape(code)}"}} {count}')
+
+        lines.append("# HELP opto_dns_changes_total DNS reconfigurations applied, by mode.")
+        lines.append("# TYPE opto_dns_changes_total counter")
+        for mode, count in sorted(dns.items()):
+            lines.append(f'opto_dns_changes_total{{mode="{self.escape(mode)}"}} {count}')
+
+        for name, value in sorted(host.items()):
+            kind = "counter" if name.endswith("_total") else "gauge"
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def start_server(self, host="127.0.0.1", port=9464):
+        """Serve /metrics on a background thread and start the host sampler"""
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Keep request logs out of the ritual console
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self.server.daemon_threads = True
+        self.stop_event.clear()
+        self.threads = [
+            threading.Thread(target=self.server.serve_forever, name="opto-metrics", daemon=True),
+            threading.Thread(target=self.sampler_loop, name="opto-metrics-sampler", daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+        return self.server.server_address
+
+    def stop_server(self):
+        """Stop the metrics endpoint and sampler"""
+        self.stop_event.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        self.threads = []
+
+
+# Built-in ritual catalog. Plugins declare the same fields in a module-level
+# RITUAL dict; "run" names a method on OPTOSystemUtility for built-ins, or a
+# function taking the utility for plugins.
+BUILTIN_RITUALS = [
+    {
+        "key": "sfc",
+        "name": "System Integrity Ritual",
+        "label": "System Integrity Scan",
+        "icon": "🛡️",
+        "title": "SYSTEM INTEGRITY",
+        "description": ["Scans and repairs corrupted system files",
+                        "A ritual of protection for your fortress"],
+        "requires_admin": True,
+        "estimated_seconds": 1200,
+        "heavy": True,
+        "actions": [{"key": "sfc", "label": "Begin Integrity Ritual", "run": "run_sfc_scan", "pause": True}],
+        "batch": "sfc",
+    },
+    {
+        "key": "chkdsk",
+        "name": "Disk Purification Ritual",
+        "label": "Disk Purification",
+        "icon": "💾",
+        "title": "DISK PURIFICATION",
+        "description": ["Scans disk for errors and repairs them",
+                        "Requires system rebirth if C: drive is active"],
+        "requires_admin": True,
+        "estimated_seconds": 15,
+        "actions": [{"key": "chkdsk", "label": "Schedule Purification", "run": "schedule_chkdsk", "pause": True}],
+        "batch": "chkdsk",
+    },
+    {
+        "key": "network",
+        "name": "Network Cleansing Ritual",
+        "label": "Network Cleansing",
+        "icon": "🌐",
+        "title": "NETWORK CLEANSING",
+        "requires_admin": True,
+        "estimated_seconds": 10,
+        "actions": [
+            {"key": "flush_dns", "label": "Flush DNS Cache", "run": "flush_dns", "pause": True},
+            {"key": "release_ip", "label": "Release IP Address", "run": "release_ip", "pause": True},
+            {"key": "renew_ip", "label": "Renew IP Address", "run": "renew_ip", "pause": True},
+            {"key": "network_reset", "label": "Complete Network Reset", "run": "run_network_reset", "pause": True},
+        ],
+        "batch": "network_reset",
+    },
+    {
+        "key": "dns",
+        "name": "DNS Reconfiguration Ritual",
+        "label": "DNS Configuration",
+        "icon": "🔮",
+        "title": "DNS CONFIGURATION",
+        "requires_admin": True,
+        "estimated_seconds": 5,
+        "dependencies": ["network"],
+        "actions": [
+            {"key": "dns_cloudflare", "label": "Set Cloudflare DNS (Speed)", "run": "set_cloudflare_dns", "pause": True},
+            {"key": "dns_custom", "label": "Set Custom DNS (Your Choice)", "run": "set_custom_dns",
+             "ask": "ask_custom_dns", "pause": True},
+            {"key": "dns_dhcp", "label": "Reset to Auto DNS (Ancient)", "run": "reset_dns_dhcp", "pause": True},
+        ],
+        "batch": "dns_cloudflare",
+    },
+]
+
+
+class RitualSpec:
+    """Ritual metadata, readable without importing the ritual's code"""
+    def __init__(self, manifest, source=None):
+        self.key = manifest["key"]
+        self.name = manifest.get("name", self.key)
+        self.label = manifest.get("label", self.name)
+        self.icon = manifest.get("icon", "✨")
+        self.title = manifest.get("title", self.label.upper())
+        self.description = list(manifest.get("description", []))
+        self.requires_admin = bool(manifest.get("requires_admin", False))
+        self.estimated_seconds = manifest.get("estimated_seconds", 0)
+        self.dependencies = list(manifest.get("dependencies", []))
+        # Heavy rituals can be queued for the idle scheduler
+        self.heavy = bool(manifest.get("heavy", False))
+        self.actions = []
+        for action in manifest.get("actions", []):
+            self.actions.append({
+                "key": action.get("key", action["run"]),
+                "label": action.get("label", action["run"]),
+                "run": action["run"],
+                # Optional step that collects user input before the timed ritual starts
+                "ask": action.get("ask"),
+                "pause": bool(action.get("pause", False)),
+            })
+        self.batch = manifest.get("batch")
+        if self.batch is not None and self.get_action(self.batch) is None:
+            raise ValueError(f"ritual '{self.key}' batch action '{self.batch}' is not declared")
+        # None for built-ins, ("file", path) or ("module", name) for plugins
+        self.source = source
+
+    def get_action(self, key):
+        """Find a declared action by key"""
+        for action in self.actions:
+            if action["key"] == key:
+                return action
+        return None
+
+
+class RitualRegistry:
+    """Ordered ritual catalog - plugin modules are imported only when a ritual is selected"""
+    ENTRY_POINT_GROUP = "opto.rituals"
+    MANIFEST_NAME = "RITUAL"
+
+    def __init__(self):
+        self.specs = {}
+        self.modules = {}
+        self.errors = []
+
+    def register(self, spec):
+        """Add a ritual; a later registration with the same key replaces the earlier one"""
+        self.specs[spec.key] = spec
+        return spec
+
+    def register_builtins(self, manifests=BUILTIN_RITUALS):
+        """Register the built-in rituals"""
+        for manifest in manifests:
+            self.register(RitualSpec(manifest))
+
+    @classmethod
+    def read_manifest(cls, path, name=None):
+        """Read the RITUAL dict literal from a plugin file without executing it"""
+        name = name or cls.MANIFEST_NAME
+        with open(path, "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in tree.body:
+            if isinstance(node, ast.Assign):
+                for target in node.targets:
+                    if isinstance(target, ast.Name) and target.id == name:
+                        return ast.literal_eval(node.value)
+        raise ValueError(f"no {name} manifest found")
+
+    @staticmethod
+    def find_module_file(module_name, search_path=None):
+        """Locate a module's source file without importing it or its parent packages"""
+        path = search_path if search_path is not None else sys.path
+        parts = module_name.split(".")
+        for depth in range(1, len(parts) + 1):
+            module_spec = importlib.machinery.PathFinder.find_spec(".".join(parts[:depth]), path)
+            if module_spec is None:
+                raise ImportError(f"module {module_name} not found")
+            if depth < len(parts):
+                path = module_spec.submodule_search_locations
+                if path is None:
+                    raise ImportError(f"{'.'.join(parts[:depth])} is not a package")
+        if not module_spec.origin or not module_spec.has_location:
+            raise ImportError(f"module {module_name} has no source file")
+        return module_spec.origin
+
+    def discover(self, plugins_dir):
+        """Register plugin rituals from a directory and from installed entry points"""
+        if os.path.isdir(plugins_dir):
+            for filename in sorted(os.listdir(plugins_dir)):
+                if not filename.endswith(".py") or filename.startswith("_"):
+                    continue
+                path = os.path.join(plugins_dir, filename)
+                try:
+                    self.register(RitualSpec(self.read_manifest(path), ("file", path)))
+                except Exception as e:
+                    self.errors.append(f"{filename}: {e}")
+
+        try:
+            from importlib.metadata import entry_points
+            found = entry_points()
+            if hasattr(found, "select"):
+                found = found.select(group=self.ENTRY_POINT_GROUP)
+            else:
+                found = found.get(self.ENTRY_POINT_GROUP, [])
+        except Exception:
+            found = []
+        for entry_point in found:
+            # "package.module" or "package.module:MANIFEST" naming the manifest variable
+            module_name, _, attr = entry_point.value.partition(":")
+            module_name = module_name.strip()
+            try:
+                path = self.find_module_file(module_name)
+                manifest = self.read_manifest(path, attr.strip() or None)
+                self.register(RitualSpec(manifest, ("module", module_name)))
+            except Exception as e:
+                self.errors.append(f"{entry_point.name}: {e}")
+
+    def import_plugin(self, spec):
+        """Import a plugin's module on first use"""
+        if spec.key in self.modules:
+            return self.modules[spec.key]
+        kind, location = spec.source
+        if kind == "file":
+            module_spec = importlib.util.spec_from_file_location(f"opto_ritual_{spec.key}", location)
+            module = importlib.util.module_from_spec(module_spec)
+            module_spec.loader.exec_module(module)
+        else:
+            module = importlib.import_module(location)
+        self.modules[spec.key] = module
+        return module
+
+    def resolve(self, spec, action, utility, step="run"):
+        """Return a callable for an action's "run" (or "ask") step, bound to the utility"""
+        if spec.source is None:
+            return getattr(utility, action[step])
+        module = self.import_plugin(spec)
+        return functools.partial(getattr(module, action[step]), utility)
+
+    def menu_rituals(self):
+        """Rituals that appear in the main menu, in registration order"""
+        return [spec for spec in self.specs.values() if spec.actions]
+
+    def batch_order(self):
+        """Rituals with a batch action, ordered so dependencies run first"""
+        pending = [spec for spec in self.specs.values() if spec.batch]
+        batch_keys = {spec.key for spec in pending}
+        ordered = []
+        done = set()
+        while pending:
+            for spec in pending:
+                if all(dep in done or dep not in batch_keys for dep in spec.dependencies):
+                    break
+            else:
+                # Dependency cycle - keep registration order for the rest
+                spec = pending[0]
+            pending.remove(spec)
+            ordered.append(spec)
+            done.add(spec.key)
+        return ordered
+
+
+class IdleDetector:
+    """Decides idleness from load samples - fed by HostLoadSampler or an injected trace
+
+    A sample is a dict with "time" (seconds), "cpu" (percent), "disk" (bytes/sec)
+    and "input_idle" (seconds since last user input, or None when unknown).
+    """
+    def __init__(self, window=300, cpu_percent=15, disk_bytes_per_sec=5 * 1024 * 1024, input_seconds=60):
+        self.window = window
+        self.cpu_percent = cpu_percent
+        self.disk_bytes_per_sec = disk_bytes_per_sec
+        self.input_seconds = input_seconds
+        self.quiet_since = None
+        self.last_sample = None
+
+    def is_quiet(self, sample):
+        """Whether a single sample is below every threshold"""
+        if sample["cpu"] >= self.cpu_percent:
+            return False
+        if sample["disk"] >= self.disk_bytes_per_sec:
+            return False
+        input_idle = sample.get("input_idle")
+        return input_idle is None or input_idle >= self.input_seconds
+
+    def observe(self, sample):
+        """Record a sample; any loud sample restarts the idle window"""
+        if self.is_quiet(sample):
+            if self.quiet_since is None:
+                self.quiet_since = sample["time"]
+        else:
+            self.quiet_since = None
+        self.last_sample = sample
+
+    def is_idle(self):
+        """Quiet for at least the whole window"""
+        if self.quiet_since is None or self.last_sample is None:
+            return False
+        return self.last_sample["time"] - self.quiet_since >= self.window
+
+    def is_busy(self):
+        """The latest sample shows load has returned"""
+        return self.last_sample is not None and self.quiet_since is None
+
+    def reset(self):
+        """Forget all samples"""
+        self.quiet_since = None
+        self.last_sample = None
+
+
+class HostLoadSampler:
+    """Produces IdleDetector samples from psutil, leaving out the maintenance job's own load"""
+    def __init__(self):
+        self.last_time = None
+        self.last_busy = None
+        self.last_total = None
+        self.last_disk = None
+        self.last_excluded = {}  # pid -> (cpu seconds, io bytes)
+        self.last_sample = None
+
+    @staticmethod
+    def input_idle_seconds():
+        """Seconds since the last keyboard/mouse input (Windows only)"""
+        try:
+            class LASTINPUTINFO(ctypes.Structure):
+                _fields_ = [("cbSize", ctypes.c_uint), ("dwTime", ctypes.c_uint)]
+            info = LASTINPUTINFO()
+            info.cbSize = ctypes.sizeof(LASTINPUTINFO)
+            if not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):
+                return None
+            millis = (ctypes.windll.kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF
+            return millis / 1000
+        except Exception:
+            return None
+
+    @staticmethod
+    def process_usage(proc):
+        """CPU seconds and I/O bytes used so far by one process, or None once it has exited"""
+        try:
+            times = proc.cpu_times()
+            cpu = times.user + times.system
+        except psutil.NoSuchProcess:
+            return None
+        except psutil.Error:
+            cpu = 0.0
+        try:
+            io = proc.io_counters()
+            disk = io.read_bytes + io.write_bytes
+        except psutil.NoSuchProcess:
+            return None
+        except (psutil.Error, AttributeError):
+            disk = 0
+        return cpu, disk
+
+    def started_since_last_sample(self, proc):
+        """Whether a process was created after the previous sample"""
+        if self.last_time is None:
+            return False
+        try:
+            return proc.create_time() >= self.last_time
+        except psutil.Error:
+            return False
+
+    def sample(self, exclude=()):
+        """Take one sample; the first call only primes the counters and reports zero load"""
+        now = time.time()
+        cpu_times = psutil.cpu_times()
+        total = sum(cpu_times)
+        busy = total - cpu_times.idle
+        try:
+            io = psutil.disk_io_counters()
+            disk = io.read_bytes + io.write_bytes
+        except Exception:
+            disk = 0
+
+        excluded = {}
+        excluded_cpu = 0.0
+        excluded_disk = 0
+        exited = False
+        for proc in exclude:
+            usage = self.process_usage(proc)
+            if usage is None:
+                exited = True
+                continue
+            excluded[proc.pid] = usage
+            previous = self.last_excluded.get(proc.pid)
+            if previous is None:
+                # A process born during this interval used all of its time inside it;
+                # an older one only becomes a baseline now
+                previous = (0.0, 0) if self.started_since_last_sample(proc) else usage
+            excluded_cpu += max(usage[0] - previous[0], 0)
+            excluded_disk += max(usage[1] - previous[1], 0)
+        if any(pid not in excluded for pid in self.last_excluded):
+            exited = True
+
+        cpu_percent = 0.0
+        disk_rate = 0.0
+        if self.last_time is not None:
+            total_delta = total - self.last_total
+            if total_delta > 0:
+                # cpu_times() totals are summed over all CPUs, like the per-process times
+                cpu_percent = max(busy - self.last_busy - excluded_cpu, 0) / total_delta * 100
+            elapsed = now - self.last_time
+            if elapsed > 0:
+                disk_rate = max(disk - self.last_disk - excluded_disk, 0) / elapsed
+        if exited and self.last_sample is not None:
+            # An excluded process ended since the last sample and its final usage went
+            # with it, so this interval can't be separated from user load - repeat the
+            # previous reading instead of reporting the job's exit as returning load
+            cpu_percent = self.last_sample["cpu"]
+            disk_rate = self.last_sample["disk"]
+
+        self.last_time = now
+        self.last_busy = busy
+        self.last_total = total
+        self.last_disk = disk
+        self.last_excluded = excluded
+        self.last_sample = {"time": now, "cpu": cpu_percent, "disk": disk_rate,
+                            "input_idle": self.input_idle_seconds()}
+        return self.last_sample
+
+
+class MaintenanceQueue:
+    """Heavy rituals waiting for idle time, persisted so they survive restarts"""
+    def __init__(self, path):
+        self.path = path
+        self.jobs = []
+        self.load()
+
+    def load(self):
+        """Load queued jobs from disk"""
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    self.jobs = json.load(f)
+        except:
+            self.jobs = []
+
+    def save(self):
+        """Write queued jobs to disk atomically"""
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump(self.jobs, f, indent=4)
+            os.replace(temp_path, self.path)
+        except:
+            pass
+
+    def add(self, ritual):
+        """Queue a ritual key and return the new job"""
+        job = {
+            "id": max([job["id"] for job in self.jobs] + [0]) + 1,
+            "ritual": ritual,
+            "queued_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        self.jobs.append(job)
+        self.save()
+        return job
+
+    def remove(self, job_id):
+        """Drop a finished job"""
+        self.jobs = [job for job in self.jobs if job["id"] != job_id]
+        self.save()
+
+    def clear(self):
+        """Drop every queued job"""
+        self.jobs = []
+        self.save()
+
+
 class OPTOSystemUtility:
+    GRAND_PURIFICATION = "grand_purification"
+
     def __init__(self):
+        self.output_lock = threading.RLock()
+        self.active_ritual = None  # spec of the ritual being performed, read by the idle scheduler
         self.is_admin = self.check_admin()
         self.script_dir = self.get_script_directory()
         self.config_file = os.path.join(self.script_dir, "opto_config.json")
@@ -49,6 +657,12 @@ class OPTOSystemUtility:
         self.pygame_initialized = False
         self.terminal_width = 80
         self.terminal_height = 25
+        self.metrics = OPTOMetrics(disk_path=os.path.splitdrive(self.script_dir)[0] + os.sep)
+        self.plugins_dir = os.path.join(self.script_dir, "rituals")
+        self.rituals = RitualRegistry()
+        self.rituals.register_builtins()
+        self.rituals.discover(self.plugins_dir)
+        self.maintenance_queue = MaintenanceQueue(os.path.join(self.script_dir, "opto_queue.json"))
         
         # EASTER EGG: If default speed is set below 25ms in code, show secret message
         self.easter_egg_triggered = False
@@ -64,7 +678,12 @@ class OPTOSystemUtility:
         except:
             self.log("Audio system initialization failed - music features disabled")
         
+        self.start_metrics()
         self.setup_terminal()
+        for error in self.rituals.errors:
+            self.log(f"Ritual scroll unreadable - {error}", "WARNING")
+        if self.maintenance_queue.jobs:
+            self.log(f"⏳ {len(self.maintenance_queue.jobs)} ritual(s) await idle time", "SCHEDULER")
         self.auto_start_music()
     
     def check_easter_egg(self):
@@ -97,7 +716,16 @@ class OPTOSystemUtility:
         """Load configuration from file"""
         default_config = {
             "text_speed": 50,  # Normal default - change this to <25 in code to trigger Easter egg
-            "auto_music": True
+            "auto_music": True,
+            "metrics_enabled": False,
+            "metrics_host": "127.0.0.1",
+            "metrics_port": 9464,
+            "idle_window_seconds": 300,
+            "idle_cpu_percent": 15,
+            "idle_disk_mb_per_sec": 5,
+            "idle_input_seconds": 60,
+            "idle_poll_seconds": 5,
+            "idle_throttle": "pause"
         }
         
         try:
@@ -150,12 +778,14 @@ class OPTOSystemUtility:
         if center:
             text = self.center_text(text)
         
-        for char in text:
-            print(char, end='', flush=True)
-            time.sleep(speed_ms / 1000)
-        
-        if newline:
-            print()
+        # Scheduled rituals log from a worker thread - keep lines whole
+        with self.output_lock:
+            for char in text:
+                print(char, end='', flush=True)
+                time.sleep(speed_ms / 1000)
+            
+            if newline:
+                print()
     
     def log(self, message, status="INFO"):
         """Enhanced logging with status and timestamps"""
@@ -200,6 +830,75 @@ class OPTOSystemUtility:
             if self.play_music():
                 self.log("🎵 Ancient melodies awaken...", "SYSTEM")
     
+    def start_metrics(self):
+        """Start the local metrics endpoint if enabled in config"""
+        if not self.config.get("metrics_enabled", False):
+            return
+        host = self.config.get("metrics_host", "127.0.0.1")
+        try:
+            port = int(self.config.get("metrics_port", 9464))
+        except (TypeError, ValueError):
+            self.log(f"Invalid metrics_port: {self.config.get('metrics_port')}", "ERROR")
+            return
+        try:
+            address = self.metrics.start_server(host, port)
+            self.log(f"📈 Metrics scroll open at http://{address[0]}:{address[1]}/metrics", "SYSTEM")
+        except (OSError, OverflowError) as e:
+            self.log(f"Metrics endpoint failed to open: {e}", "ERROR")
+    
+    def run_command(self, args, **kwargs):
+        """Run a system command and record its exit code in the metrics"""
+        try:
+            result = subprocess.run(args, **kwargs)
+        except subprocess.CalledProcessError as e:
+            self.metrics.record_command(args[0], e.returncode)
+            raise
+        except subprocess.TimeoutExpired:
+            self.metrics.record_command(args[0], "timeout")
+            raise
+        except OSError:
+            self.metrics.record_command(args[0], "error")
+            raise
+        self.metrics.record_command(args[0], result.returncode)
+        return result
+    
+    def perform_ritual(self, name, ritual):
+        """Perform a ritual while recording its run, outcome and duration
+
+        Rituals return False when they failed; anything else counts as success.
+        """
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            success = ritual() is not False
+            if success:
+                outcome = "success"
+            return success
+        finally:
+            self.metrics.record_ritual(name, time.perf_counter() - start, outcome)
+    
+    def run_ritual_action(self, spec, action, args=()):
+        """Load and perform one action of a registered ritual"""
+        if spec.requires_admin and not self.is_admin:
+            self.log(f"{spec.name} requires administrator privileges - skipped", "WARNING")
+            return False
+        try:
+            ritual = self.rituals.resolve(spec, action, self)
+        except Exception as e:
+            self.log(f"The {spec.name} could not be summoned: {e}", "ERROR")
+            return False
+        self.active_ritual = spec
+        try:
+            return self.perform_ritual(action["key"], functools.partial(ritual, *args))
+        finally:
+            self.active_ritual = None
+    
+    def format_estimate(self, seconds):
+        """Human readable estimated duration"""
+        if seconds >= 60:
+            return f"~{round(seconds / 60)} min"
+        return f"~{seconds} sec"
+    
     def load_mp3_file(self, filename):
         """Load an MP3 file"""
         if os.path.isabs(filename):
@@ -225,13 +924,13 @@ class OPTOSystemUtility:
         time.sleep(2)
         
         try:
-            result = subprocess.run(['sfc', '/scannow'], capture_output=True, text=True, check=True)
+            result = self.run_command(['sfc', '/scannow'], capture_output=True, text=True, check=True)
             self.log("System scan completed", "SUCCESS")
             self.log("Windows has examined the fortress walls", "COMPLETE")
+            return True
         except subprocess.CalledProcessError as e:
             self.log(f"Ritual failed: {e}", "ERROR")
-        
-        input("\nPress Enter to continue your journey...")
+            return False
     
     def schedule_chkdsk(self):
         """Schedule disk check with detailed logging - FIXED MUSIC ISSUE"""
@@ -244,10 +943,11 @@ class OPTOSystemUtility:
         # Ensure music continues playing during this operation
         self.ensure_music_playing()
         
+        success = True
         try:
             # Use a different approach that doesn't block music
             # Run chkdsk without waiting for user input by using pre-answered prompt
-            result = subprocess.run(
+            result = self.run_command(
                 ['chkdsk', '/f', '/r'], 
                 capture_output=True, 
                 text=True, 
@@ -262,10 +962,11 @@ class OPTOSystemUtility:
             self.log("The disk shall be cleansed upon rebirth", "COMPLETE")
         except Exception as e:
             self.log(f"Ritual interrupted: {e}", "ERROR")
+            success = False
         
         # Double-check music is still playing
         self.ensure_music_playing()
-        input("\nPress Enter to continue your journey...")
+        return success
     
     def flush_dns(self):
         """Flush DNS cache with detailed logging"""
@@ -274,11 +975,13 @@ class OPTOSystemUtility:
         self.log("Purpose: Clears DNS resolver cache", "INFO")
         
         try:
-            subprocess.run(['ipconfig', '/flushdns'], check=True)
+            self.run_command(['ipconfig', '/flushdns'], check=True)
             self.log("DNS cache purified", "SUCCESS")
             self.log("The paths of communication are cleared", "COMPLETE")
+            return True
         except subprocess.CalledProcessError as e:
             self.log(f"Cleansing failed: {e}", "ERROR")
+            return False
     
     def release_ip(self):
         """Release IP address with detailed logging"""
@@ -287,10 +990,12 @@ class OPTOSystemUtility:
         self.log("Purpose: Releases current IP address", "INFO")
         
         try:
-            subprocess.run(['ipconfig', '/release'], check=True)
+            self.run_command(['ipconfig', '/release'], check=True)
             self.log("IP address released from service", "SUCCESS")
+            return True
         except subprocess.CalledProcessError as e:
             self.log(f"Release failed: {e}", "ERROR")
+            return False
     
     def renew_ip(self):
         """Renew IP address with detailed logging"""
@@ -299,11 +1004,13 @@ class OPTOSystemUtility:
         self.log("Purpose: Requests new IP address from DHCP", "INFO")
         
         try:
-            subprocess.run(['ipconfig', '/renew'], check=True)
+            self.run_command(['ipconfig', '/renew'], check=True)
             self.log("New IP address forged", "SUCCESS")
             self.log("The network flows with renewed energy", "COMPLETE")
+            return True
         except subprocess.CalledProcessError as e:
             self.log(f"Renewal failed: {e}", "ERROR")
+            return False
     
     def set_cloudflare_dns(self):
         """Set Cloudflare DNS with detailed logging"""
@@ -315,19 +1022,23 @@ class OPTOSystemUtility:
             interfaces = self.get_network_interfaces()
             if interfaces:
                 for interface in interfaces:
-                    subprocess.run(['netsh', 'interface', 'ip', 'set', 'dns', 
+                    self.run_command(['netsh', 'interface', 'ip', 'set', 'dns', 
                                   f'name={interface}', 'source=static', 'addr=1.1.1.1'], check=True)
-                    subprocess.run(['netsh', 'interface', 'ip', 'add', 'dns', 
+                    self.run_command(['netsh', 'interface', 'ip', 'add', 'dns', 
                                   f'name={interface}', 'addr=1.0.0.1', 'index=2'], check=True)
+                self.metrics.record_dns_change("cloudflare")
                 self.log("Cloudflare DNS gates are active", "SUCCESS")
                 self.log("Your connection is now blessed with speed", "COMPLETE")
+                return True
             else:
                 self.log("No network interfaces found in the realm", "WARNING")
+                return False
         except subprocess.CalledProcessError as e:
             self.log(f"Gate configuration failed: {e}", "ERROR")
+            return False
     
-    def set_custom_dns(self):
-        """Set custom DNS servers provided by user"""
+    def ask_custom_dns(self):
+        """Ask for custom DNS servers; returns (primary, secondary) or None if cancelled"""
         self.clear_screen()
         print()
         print(self.center_text("================================================"))
@@ -350,9 +1061,11 @@ class OPTOSystemUtility:
         
         if not primary_dns:
             self.typewriter("❌ No primary DNS provided", center=True)
-            input("Press Enter to continue...")
-            return
-        
+            return None
+        return primary_dns, secondary_dns
+    
+    def set_custom_dns(self, primary_dns, secondary_dns=""):
+        """Set custom DNS servers provided by user"""
         self.log("🌐 CONFIGURING CUSTOM ETHERNET GATES", "DNS")
         self.log(f"Command: netsh interface ip set dns [Custom: {primary_dns}, {secondary_dns}]", "COMMAND")
         self.log("Purpose: Sets custom DNS servers provided by user", "INFO")
@@ -362,24 +1075,28 @@ class OPTOSystemUtility:
             if interfaces:
                 for interface in interfaces:
                     # Set primary DNS
-                    subprocess.run(['netsh', 'interface', 'ip', 'set', 'dns', 
+                    self.run_command(['netsh', 'interface', 'ip', 'set', 'dns', 
                                   f'name={interface}', 'source=static', f'addr={primary_dns}'], check=True)
                     
                     # Set secondary DNS if provided
                     if secondary_dns:
-                        subprocess.run(['netsh', 'interface', 'ip', 'add', 'dns', 
+                        self.run_command(['netsh', 'interface', 'ip', 'add', 'dns', 
                                       f'name={interface}', f'addr={secondary_dns}', 'index=2'], check=True)
                 
+                self.metrics.record_dns_change("custom")
                 self.log("Custom DNS gates are active", "SUCCESS")
                 if secondary_dns:
                     self.log(f"Primary: {primary_dns}, Secondary: {secondary_dns}", "CONFIG")
                 else:
                     self.log(f"Primary: {primary_dns}", "CONFIG")
                 self.log("Your connection now follows your chosen path", "COMPLETE")
+                return True
             else:
                 self.log("No network interfaces found in the realm", "WARNING")
+                return False
         except subprocess.CalledProcessError as e:
             self.log(f"Custom gate configuration failed: {e}", "ERROR")
+            return False
     
     def reset_dns_dhcp(self):
         """Reset DNS to DHCP with detailed logging"""
@@ -391,19 +1108,23 @@ class OPTOSystemUtility:
             interfaces = self.get_network_interfaces()
             if interfaces:
                 for interface in interfaces:
-                    subprocess.run(['netsh', 'interface', 'ip', 'set', 'dns', 
+                    self.run_command(['netsh', 'interface', 'ip', 'set', 'dns', 
                                   f'name={interface}', 'source=dhcp'], check=True)
+                self.metrics.record_dns_change("dhcp")
                 self.log("DNS restored to ancient protocols", "SUCCESS")
                 self.log("The old ways are preserved", "COMPLETE")
+                return True
             else:
                 self.log("No network interfaces to restore", "WARNING")
+                return False
         except subprocess.CalledProcessError as e:
             self.log(f"Restoration failed: {e}", "ERROR")
+            return False
     
     def get_network_interfaces(self):
         """Get active network interfaces"""
         try:
-            result = subprocess.run(['netsh', 'interface', 'show', 'interface'], 
+            result = self.run_command(['netsh', 'interface', 'show', 'interface'], 
                                   capture_output=True, text=True, check=True)
             interfaces = []
             for line in result.stdout.split('\n'):
@@ -422,30 +1143,26 @@ class OPTOSystemUtility:
         self.log("All rituals will be performed in sequence", "WARNING")
         time.sleep(2)
         
-        rituals = [
-            ("🛡️  System Integrity Ritual", self.run_sfc_scan),
-            ("💾 Disk Purification Ritual", self.schedule_chkdsk),
-            ("🌐 Network Cleansing Ritual", self.run_network_reset),
-            ("🔮 DNS Reconfiguration Ritual", self.set_cloudflare_dns),
-        ]
-        
-        for name, ritual in rituals:
-            self.log(f"Performing: {name}", "RITUAL")
-            ritual()
+        success = True
+        for spec in self.rituals.batch_order():
+            self.log(f"Performing: {spec.icon} {spec.name}", "RITUAL")
+            if not self.run_ritual_action(spec, spec.get_action(spec.batch)):
+                success = False
             time.sleep(1)
         
         self.log("🎉 ALL GRAND RITUALS COMPLETED 🎉", "VICTORY")
         self.log("Your system has been blessed with ancient power", "COMPLETE")
-        input("\nPress Enter to continue your journey...")
+        return success
     
     def run_network_reset(self):
         """Run complete network reset"""
-        self.flush_dns()
+        flushed = self.flush_dns()
         time.sleep(1)
-        self.release_ip()
+        released = self.release_ip()
         time.sleep(2)
-        self.renew_ip()
+        renewed = self.renew_ip()
         self.log("Network reset ritual complete", "SUCCESS")
+        return flushed and released and renewed
     
     def text_speed_menu(self):
         """Simple text speed adjustment"""
@@ -518,6 +1235,14 @@ class OPTOSystemUtility:
     def main_menu(self):
         """Main menu loop with RPG style"""
         while True:
+            rituals = self.rituals.menu_rituals()
+            extras = [
+                ("Grand Purification (All)", self.run_all_menu),
+                ("Scroll Speed", self.text_speed_menu),
+                ("Ancient Melodies", self.music_menu),
+                ("Idle Scheduler", self.scheduler_menu),
+            ]
+            
             self.clear_screen()
             print()
             print()
@@ -528,13 +1253,10 @@ class OPTOSystemUtility:
             print()
             self.typewriter("Choose your ritual, brave one:", center=True)
             print()
-            self.typewriter("[1] System Integrity Scan", center=True)
-            self.typewriter("[2] Disk Purification", center=True)
-            self.typewriter("[3] Network Cleansing", center=True)
-            self.typewriter("[4] DNS Configuration", center=True)
-            self.typewriter("[5] Grand Purification (All)", center=True)
-            self.typewriter("[6] Scroll Speed", center=True)
-            self.typewriter("[7] Ancient Melodies", center=True)
+            for number, spec in enumerate(rituals, 1):
+                self.typewriter(f"[{number}] {spec.label}", center=True)
+            for number, (label, _) in enumerate(extras, len(rituals) + 1):
+                self.typewriter(f"[{number}] {label}", center=True)
             self.typewriter("[0] Leave the Realm", center=True)
             print()
             print(self.center_text("════════════════════════════════════════════════"))
@@ -542,119 +1264,52 @@ class OPTOSystemUtility:
             
             choice = input("                YOUR CHOICE: ").strip()
             
-            if choice == "1":
-                self.sfc_menu()
-            elif choice == "2":
-                self.chkdsk_menu()
-            elif choice == "3":
-                self.network_menu()
-            elif choice == "4":
-                self.dns_menu()
-            elif choice == "5":
-                self.run_all_menu()
-            elif choice == "6":
-                self.text_speed_menu()
-            elif choice == "7":
-                self.music_menu()
-            elif choice == "0":
+            if choice == "0":
                 self.leave_realm()
                 break
+            if not choice.isdigit():
+                continue
+            number = int(choice)
+            if 1 <= number <= len(rituals):
+                self.ritual_menu(rituals[number - 1])
+            elif len(rituals) < number <= len(rituals) + len(extras):
+                extras[number - len(rituals) - 1][1]()
     
-    def sfc_menu(self):
-        """SFC menu"""
-        self.clear_screen()
-        print()
-        print(self.center_text("================================================"))
-        self.typewriter("           🛡️ SYSTEM INTEGRITY", center=True)
-        print(self.center_text("================================================"))
-        print()
-        self.typewriter("Scans and repairs corrupted system files", center=True)
-        self.typewriter("A ritual of protection for your fortress", center=True)
-        print()
-        print(self.center_text("[1] Begin Integrity Ritual"))
-        print(self.center_text("[2] Return to Main Menu"))
-        print()
-        print(self.center_text("================================================"))
-        print()
-        choice = input("                CHOOSE: ").strip()
-        if choice == "1":
-            self.run_sfc_scan()
-    
-    def chkdsk_menu(self):
-        """CHKDSK menu"""
+    def ritual_menu(self, spec):
+        """Menu for a single registered ritual"""
         self.clear_screen()
         print()
         print(self.center_text("================================================"))
-        self.typewriter("           💾 DISK PURIFICATION", center=True)
-        print(self.center_text("================================================"))
-        print()
-        self.typewriter("Scans disk for errors and repairs them", center=True)
-        self.typewriter("Requires system rebirth if C: drive is active", center=True)
-        print()
-        print(self.center_text("[1] Schedule Purification"))
-        print(self.center_text("[2] Return to Main Menu"))
-        print()
+        self.typewriter(f"           {spec.icon} {spec.title}", center=True)
         print(self.center_text("================================================"))
         print()
-        choice = input("                CHOOSE: ").strip()
-        if choice == "1":
-            self.schedule_chkdsk()
-    
-    def network_menu(self):
-        """Network menu"""
-        self.clear_screen()
-        print()
-        print(self.center_text("================================================"))
-        self.typewriter("           🌐 NETWORK CLEANSING", center=True)
-        print(self.center_text("================================================"))
-        print()
-        print(self.center_text("[1] Flush DNS Cache"))
-        print(self.center_text("[2] Release IP Address"))
-        print(self.center_text("[3] Renew IP Address"))
-        print(self.center_text("[4] Complete Network Reset"))
-        print(self.center_text("[5] Return to Main Menu"))
-        print()
-        print(self.center_text("================================================"))
-        print()
-        choice = input("                CHOOSE: ").strip()
-        if choice == "1":
-            self.flush_dns()
-            input("\nPress Enter to continue...")
-        elif choice == "2":
-            self.release_ip()
-            input("\nPress Enter to continue...")
-        elif choice == "3":
-            self.renew_ip()
-            input("\nPress Enter to continue...")
-        elif choice == "4":
-            self.run_network_reset()
-            input("\nPress Enter to continue...")
-    
-    def dns_menu(self):
-        """DNS menu"""
-        self.clear_screen()
-        print()
-        print(self.center_text("================================================"))
-        self.typewriter("           🔮 DNS CONFIGURATION", center=True)
-        print(self.center_text("================================================"))
-        print()
-        print(self.center_text("[1] Set Cloudflare DNS (Speed)"))
-        print(self.center_text("[2] Set Custom DNS (Your Choice)"))
-        print(self.center_text("[3] Reset to Auto DNS (Ancient)"))
-        print(self.center_text("[4] Return to Main Menu"))
+        for line in spec.description:
+            self.typewriter(line, center=True)
+        if spec.estimated_seconds:
+            self.typewriter(f"Estimated time: {self.format_estimate(spec.estimated_seconds)}", center=True)
+        if spec.description or spec.estimated_seconds:
+            print()
+        for number, action in enumerate(spec.actions, 1):
+            print(self.center_text(f"[{number}] {action['label']}"))
+        print(self.center_text(f"[{len(spec.actions) + 1}] Return to Main Menu"))
         print()
         print(self.center_text("================================================"))
         print()
         choice = input("                CHOOSE: ").strip()
-        if choice == "1":
-            self.set_cloudflare_dns()
-            input("\nPress Enter to continue...")
-        elif choice == "2":
-            self.set_custom_dns()
-            input("\nPress Enter to continue...")
-        elif choice == "3":
-            self.reset_dns_dhcp()
-            input("\nPress Enter to continue...")
+        if choice.isdigit() and 1 <= int(choice) <= len(spec.actions):
+            action = spec.actions[int(choice) - 1]
+            args = ()
+            if action["ask"]:
+                # Prompt before the ritual is timed so typing is not counted as duration
+                try:
+                    args = self.rituals.resolve(spec, action, self, step="ask")()
+                except Exception as e:
+                    self.log(f"The {spec.name} could not be summoned: {e}", "ERROR")
+                    args = None
+            if args is not None:
+                self.run_ritual_action(spec, action, args)
+            if action["pause"]:
+                input("\nPress Enter to continue...")
     
     def run_all_menu(self):
         """Run all operations menu"""
@@ -666,6 +1321,8 @@ class OPTOSystemUtility:
         print()
         self.typewriter("WARNING: All rituals will be performed", center=True)
         self.typewriter("This may take considerable time", center=True)
+        estimate = sum(spec.estimated_seconds for spec in self.rituals.batch_order())
+        self.typewriter(f"Estimated time: {self.format_estimate(estimate)}", center=True)
         print()
         print(self.center_text("[1] Begin Grand Ritual"))
         print(self.center_text("[2] Return to Main Menu"))
@@ -674,7 +1331,182 @@ class OPTOSystemUtility:
         print()
         choice = input("                CHOOSE: ").strip()
         if choice == "1":
-            self.run_all_operations()
+            self.perform_ritual("grand_purification", self.run_all_operations)
+            input("\nPress Enter to continue your journey...")
+    
+    def job_label(self, ritual):
+        """Display name for a queued ritual key"""
+        if ritual == self.GRAND_PURIFICATION:
+            return "Grand Purification"
+        spec = self.rituals.specs.get(ritual)
+        return spec.label if spec else ritual
+    
+    def scheduler_menu(self):
+        """Queue heavy rituals and watch for idle time"""
+        while True:
+            heavy = [spec for spec in self.rituals.specs.values() if spec.heavy and spec.batch]
+            options = [(f"Queue {spec.label}", spec.key) for spec in heavy]
+            options.append(("Queue Grand Purification", self.GRAND_PURIFICATION))
+            
+            self.clear_screen()
+            print()
+            print(self.center_text("================================================"))
+            self.typewriter("           ⏳ IDLE SCHEDULER", center=True)
+            print(self.center_text("================================================"))
+            print()
+            self.typewriter("Heavy rituals wait until the realm is idle", center=True)
+            self.typewriter(f"Idle window: {self.config.get('idle_window_seconds', 300)}s", center=True)
+            print()
+            if self.maintenance_queue.jobs:
+                for job in self.maintenance_queue.jobs:
+                    print(self.center_text(f"#{job['id']} {self.job_label(job['ritual'])} (queued {job['queued_at']})"))
+            else:
+                print(self.center_text("No rituals queued"))
+            print()
+            for number, (label, _) in enumerate(options, 1):
+                print(self.center_text(f"[{number}] {label}"))
+            print(self.center_text(f"[{len(options) + 1}] Begin Idle Watch"))
+            print(self.center_text(f"[{len(options) + 2}] Clear Queue"))
+            print(self.center_text(f"[{len(options) + 3}] Return to Main Menu"))
+            print()
+            print(self.center_text("================================================"))
+            print()
+            choice = input("                CHOOSE: ").strip()
+            
+            if not choice.isdigit():
+                continue
+            number = int(choice)
+            if 1 <= number <= len(options):
+                job = self.maintenance_queue.add(options[number - 1][1])
+                self.typewriter(f"{self.job_label(job['ritual'])} awaits idle time", center=True)
+                input("Press Enter to continue...")
+            elif number == len(options) + 1:
+                self.clear_screen()
+                self.run_idle_scheduler()
+                input("\nPress Enter to continue your journey...")
+            elif number == len(options) + 2:
+                self.maintenance_queue.clear()
+            elif number == len(options) + 3:
+                break
+    
+    def run_maintenance_job(self, job):
+        """Perform a queued ritual"""
+        try:
+            if job["ritual"] == self.GRAND_PURIFICATION:
+                self.perform_ritual(self.GRAND_PURIFICATION, self.run_all_operations)
+                return
+            spec = self.rituals.specs.get(job["ritual"])
+            if spec is None or not spec.batch:
+                self.log(f"Unknown ritual in queue: {job['ritual']}", "WARNING")
+                return
+            self.run_ritual_action(spec, spec.get_action(spec.batch))
+        except Exception as e:
+            self.log(f"Scheduled ritual failed: {e}", "ERROR")
+    
+    def throttle_processes(self, procs, throttled, mode):
+        """Suspend or deprioritize job processes; returns how many were newly throttled"""
+        count = 0
+        for proc in procs:
+            if proc.pid in throttled:
+                continue
+            try:
+                if mode == "nice":
+                    original_ionice = proc.ionice() if hasattr(proc, "ionice") else None
+                    # Record before changing anything so a failure halfway is still restored
+                    throttled[proc.pid] = (proc, (proc.nice(), original_ionice))
+                    proc.nice(getattr(psutil, "IDLE_PRIORITY_CLASS", 19))
+                    if original_ionice is not None:
+                        if hasattr(psutil, "IOPRIO_VERYLOW"):
+                            # Windows
+                            proc.ionice(psutil.IOPRIO_VERYLOW)
+                        elif hasattr(psutil, "IOPRIO_CLASS_IDLE"):
+                            # Linux
+                            proc.ionice(psutil.IOPRIO_CLASS_IDLE)
+                else:
+                    throttled[proc.pid] = (proc, None)
+                    proc.suspend()
+                count += 1
+            except (psutil.Error, OSError, AttributeError, ValueError):
+                pass
+        return count
+    
+    def restore_processes(self, throttled):
+        """Undo throttle_processes"""
+        for proc, original in throttled.values():
+            try:
+                if original is None:
+                    proc.resume()
+                    continue
+                proc.nice(original[0])
+                if isinstance(original[1], int):
+                    proc.ionice(original[1])
+                elif original[1] is not None:
+                    proc.ionice(original[1].ioclass, original[1].value)
+            except (psutil.Error, OSError, AttributeError, ValueError):
+                pass
+        throttled.clear()
+    
+    def run_idle_scheduler(self):
+        """Start queued heavy rituals once the host is idle, throttling them when load returns"""
+        detector = IdleDetector(
+            window=self.config.get("idle_window_seconds", 300),
+            cpu_percent=self.config.get("idle_cpu_percent", 15),
+            disk_bytes_per_sec=self.config.get("idle_disk_mb_per_sec", 5) * 1024 * 1024,
+            input_seconds=self.config.get("idle_input_seconds", 60),
+        )
+        sampler = HostLoadSampler()
+        poll = self.config.get("idle_poll_seconds", 5)
+        mode = self.config.get("idle_throttle", "pause")
+        me = psutil.Process()
+        worker = None
+        job = None
+        throttled = {}
+        
+        self.log("⏳ WATCHING FOR IDLE TIME", "SCHEDULER")
+        self.log(f"{len(self.maintenance_queue.jobs)} ritual(s) queued - Ctrl+C to stop watching", "INFO")
+        try:
+            while True:
+                children = me.children(recursive=True) if worker else []
+                # Our own process runs in-process ritual work (plugins, logging) - not host load
+                detector.observe(sampler.sample(exclude=[me] + children))
+                active = self.active_ritual
+                heavy_running = active is not None and active.heavy
+                
+                if worker is None:
+                    if not self.maintenance_queue.jobs:
+                        self.log("The queue is empty - all rituals performed", "COMPLETE")
+                        break
+                    if detector.is_idle():
+                        job = self.maintenance_queue.jobs[0]
+                        self.log(f"The realm is idle - performing {self.job_label(job['ritual'])}", "SCHEDULER")
+                        worker = threading.Thread(target=self.run_maintenance_job, args=(job,), daemon=True)
+                        worker.start()
+                elif not worker.is_alive():
+                    self.restore_processes(throttled)
+                    self.maintenance_queue.remove(job["id"])
+                    self.log(f"{self.job_label(job['ritual'])} complete", "SCHEDULER")
+                    worker = None
+                    job = None
+                elif not heavy_running:
+                    # Only heavy rituals are throttled; light steps of a batch run as normal
+                    if throttled:
+                        self.restore_processes(throttled)
+                elif detector.is_busy():
+                    if self.throttle_processes(children, throttled, mode):
+                        action = "deprioritized" if mode == "nice" else "paused"
+                        self.log(f"Load returned - ritual {action}", "SCHEDULER")
+                elif throttled and detector.is_idle():
+                    self.restore_processes(throttled)
+                    self.log("The realm is idle again - ritual resumed", "SCHEDULER")
+                
+                time.sleep(poll)
+        except KeyboardInterrupt:
+            self.restore_processes(throttled)
+            if worker is not None and worker.is_alive():
+                self.log("Waiting for the running ritual to finish...", "SCHEDULER")
+                worker.join()
+                self.maintenance_queue.remove(job["id"])
+            self.log("Idle watch ended", "SCHEDULER")
     
     def leave_realm(self):
         """Exit the program with style"""
@@ -688,6 +1520,7 @@ class OPTOSystemUtility:
     def cleanup(self):
         """Cleanup resources"""
         self.stop_music()
+        self.metrics.stop_server()
         if self.pygame_initialized:
             pygame.mixer.quit()
 
@@ -716,7 +1549,11 @@ def main():
     utility = OPTOSystemUtility()
     
     try:
-        utility.main_menu()
+        if "--idle-watch" in sys.argv[1:]:
+            utility.run_idle_scheduler()
+            utility.cleanup()
+        else:
+            utility.main_menu()
     except KeyboardInterrupt:
         utility.cleanup()
         print("\nOPTO System Utility closed.")
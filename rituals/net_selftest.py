@@ -0,0 +1,436 @@
+"""Network stack self-test ritual.
+
+Measures TCP throughput, small-message round trips and connection setup rate
+against a server on loopback, or against a peer host running this file with
+--serve. Can also be run on its own:
+
+    python net_selftest.py              # loopback self-test
+    python net_selftest.py --serve      # serve for a peer on port 5201
+    python net_selftest.py --peer HOST  # test against a serving peer
+"""
+import os
+import sys
+import json
+import time
+import socket
+import struct
+import subprocess
+import tempfile
+import threading
+
+RITUAL = {
+    "key": "net_selftest",
+    "name": "Network Self-Test Ritual",
+    "label": "Network Self-Test",
+    "icon": "📡",
+    "title": "NETWORK SELF-TEST",
+    "description": ["Measures throughput, round trips and connection rate",
+                    "Results are compared with your stored baseline"],
+    "requires_admin": False,
+    "estimated_seconds": 15,
+    "actions": [
+        {"key": "net_selftest", "label": "Loopback Self-Test", "run": "run_loopback", "pause": True},
+        {"key": "net_selftest_peer", "label": "Test Against Peer Host", "run": "run_peer", "ask": "ask_peer",
+         "pause": True},
+        {"key": "net_selftest_serve", "label": "Serve for Peer Host", "run": "serve_for_peer", "pause": True},
+        {"key": "net_selftest_baseline", "label": "Record New Baseline", "run": "record_baseline", "pause": True},
+    ],
+}
+
+DEFAULT_PORT = 5201
+BUFFER_SIZE = 1024 * 1024          # reusable receive buffer per connection
+PAYLOAD_SIZE = 4 * 1024 * 1024     # file handed to sendfile per call
+SOCKET_BUFFER = 4 * 1024 * 1024
+MESSAGE_SIZE = 64
+STREAMS = 4
+DURATION = 3
+TIMEOUT = 10                       # seconds to wait on connect/send/recv
+COUNT = struct.Struct("!Q")
+
+MODE_THROUGHPUT = b"T"
+MODE_ECHO = b"E"
+
+METRICS = [
+    ("throughput_mb_per_sec", "Throughput", "MB/s"),
+    ("round_trips_per_sec", "Round trips", "/s"),
+    ("connections_per_sec", "Connections", "/s"),
+]
+
+
+def tune_socket(sock):
+    """Large kernel buffers for bulk transfer"""
+    for option in (socket.SO_SNDBUF, socket.SO_RCVBUF):
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, option, SOCKET_BUFFER)
+        except OSError:
+            pass
+
+
+def recv_exactly(sock, view):
+    """Fill a memoryview from the socket, returning False on EOF"""
+    received = 0
+    while received < len(view):
+        n = sock.recv_into(view[received:])
+        if not n:
+            return False
+        received += n
+    return True
+
+
+class SelfTestServer:
+    """Sink, echo and accept server used by the self-test client"""
+    def __init__(self, host="127.0.0.1", port=0):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        tune_socket(self.sock)
+        self.sock.bind((host, port))
+        self.sock.listen(128)
+        self.address = self.sock.getsockname()
+        self.thread = None
+
+    def start(self):
+        """Accept connections on a background thread"""
+        self.thread = threading.Thread(target=self.serve_forever, name="opto-selftest-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def serve_forever(self):
+        """Accept until the listening socket is closed"""
+        # Wake up periodically so Ctrl+C is delivered on Windows too
+        self.sock.settimeout(1.0)
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            conn.settimeout(None)
+            threading.Thread(target=self.handle, args=(conn,), daemon=True).start()
+
+    def handle(self, conn):
+        """Dispatch one connection on its mode byte; an immediate close is a connect probe"""
+        with conn:
+            try:
+                mode = conn.recv(1)
+                if mode == MODE_THROUGHPUT:
+                    self.drain(conn)
+                elif mode == MODE_ECHO:
+                    self.echo(conn)
+            except OSError:
+                pass
+
+    def drain(self, conn):
+        """Receive into one reusable buffer until EOF, then report the byte count"""
+        view = memoryview(bytearray(BUFFER_SIZE))
+        total = 0
+        while True:
+            n = conn.recv_into(view)
+            if not n:
+                break
+            total += n
+        conn.sendall(COUNT.pack(total))
+
+    def echo(self, conn):
+        """Echo fixed-size messages back until EOF"""
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        view = memoryview(bytearray(MESSAGE_SIZE))
+        while recv_exactly(conn, view):
+            conn.sendall(view)
+
+    def close(self):
+        """Stop accepting connections"""
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+def make_payload():
+    """Temporary file used as the sendfile source"""
+    payload = tempfile.TemporaryFile()
+    chunk = os.urandom(64 * 1024)
+    for _ in range(PAYLOAD_SIZE // len(chunk)):
+        payload.write(chunk)
+    payload.flush()
+    return payload
+
+
+def measure_throughput(address, streams=STREAMS, duration=DURATION, zero_copy=None):
+    """Bulk transfer over parallel streams, in MB/s as counted by the receiver"""
+    if zero_copy is None:
+        # Without os.sendfile (Windows) socket.sendfile is only a read+send loop
+        zero_copy = hasattr(os, "sendfile")
+    payloads = [make_payload() for _ in range(streams)]
+    buffer = memoryview(bytearray(os.urandom(BUFFER_SIZE)))
+    received = [0] * streams
+    errors = []
+    start_barrier = threading.Barrier(streams + 1)
+    deadline = [0.0]
+
+    def stream(index):
+        try:
+            with socket.create_connection(address, timeout=TIMEOUT) as sock:
+                tune_socket(sock)
+                sock.sendall(MODE_THROUGHPUT)
+                start_barrier.wait(TIMEOUT)
+                while time.perf_counter() < deadline[0]:
+                    if zero_copy:
+                        # The send fallback reads from the file position, so rewind every call
+                        payloads[index].seek(0)
+                        sock.sendfile(payloads[index], 0, PAYLOAD_SIZE)
+                    else:
+                        sock.sendall(buffer)
+                sock.shutdown(socket.SHUT_WR)
+                reply = memoryview(bytearray(COUNT.size))
+                if recv_exactly(sock, reply):
+                    received[index] = COUNT.unpack(reply)[0]
+        except Exception as e:
+            errors.append(e)
+            start_barrier.abort()
+
+    threads = [threading.Thread(target=stream, args=(i,), daemon=True) for i in range(streams)]
+    for thread in threads:
+        thread.start()
+    try:
+        start = time.perf_counter()
+        deadline[0] = start + duration
+        start_barrier.wait(TIMEOUT)
+    except threading.BrokenBarrierError:
+        pass
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    for payload in payloads:
+        payload.close()
+    if errors:
+        raise errors[0]
+    return sum(received) / elapsed / 1e6
+
+
+def measure_round_trips(address, duration=DURATION):
+    """Small-message ping-pong rate on a single connection"""
+    with socket.create_connection(address, timeout=TIMEOUT) as sock:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.sendall(MODE_ECHO)
+        message = memoryview(bytearray(os.urandom(MESSAGE_SIZE)))
+        reply = memoryview(bytearray(MESSAGE_SIZE))
+        count = 0
+        start = time.perf_counter()
+        deadline = start + duration
+        while time.perf_counter() < deadline:
+            sock.sendall(message)
+            if not recv_exactly(sock, reply):
+                raise ConnectionError("echo server closed the connection")
+            count += 1
+        return count / (time.perf_counter() - start)
+
+
+def measure_connections(address, duration=DURATION):
+    """TCP connection setup rate; closes with RST so the client leaves no TIME_WAIT behind"""
+    family, kind, proto, _, sockaddr = socket.getaddrinfo(address[0], address[1], type=socket.SOCK_STREAM)[0]
+    linger = struct.pack("ii", 1, 0)
+    count = 0
+    start = time.perf_counter()
+    deadline = start + duration
+    while time.perf_counter() < deadline:
+        sock = socket.socket(family, kind, proto)
+        try:
+            sock.settimeout(TIMEOUT)
+            sock.connect(sockaddr)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, linger)
+        finally:
+            sock.close()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def run_selftest(address, streams=STREAMS, duration=DURATION):
+    """Run all three measurements against a serving address"""
+    return {
+        "throughput_mb_per_sec": measure_throughput(address, streams, duration),
+        "round_trips_per_sec": measure_round_trips(address, duration),
+        "connections_per_sec": measure_connections(address, duration),
+    }
+
+
+def spawn_loopback_server():
+    """Serve from a child process so client and server do not contend for one interpreter"""
+    proc = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--serve", "--bind", "127.0.0.1", "--port", "0"],
+        stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, text=True
+    )
+    try:
+        # "Serving self-tests on HOST:PORT - Ctrl+C to stop"
+        return proc, parse_peer(proc.stdout.readline().split()[3])
+    except (IndexError, ValueError):
+        proc.kill()
+        proc.wait()
+        raise OSError("loopback self-test server did not start")
+
+
+def run_loopback_selftest(streams=STREAMS, duration=DURATION):
+    """Self-test against a temporary server on 127.0.0.1"""
+    if getattr(sys, "frozen", False):
+        # No separate interpreter to launch - serve from a thread instead
+        server = SelfTestServer("127.0.0.1", 0).start()
+        try:
+            return run_selftest(server.address, streams, duration)
+        finally:
+            server.close()
+
+    proc, address = spawn_loopback_server()
+    try:
+        return run_selftest(address, streams, duration)
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def parse_peer(text):
+    """HOST or HOST:PORT"""
+    host, _, port = text.strip().rpartition(":")
+    if not host:
+        return text.strip(), DEFAULT_PORT
+    return host, int(port)
+
+
+def compare(results, baseline):
+    """Report lines for each metric, with the change from baseline when one exists"""
+    lines = []
+    for key, label, unit in METRICS:
+        line = f"{label}: {results[key]:,.1f} {unit}"
+        if baseline and baseline.get(key):
+            change = (results[key] - baseline[key]) / baseline[key] * 100
+            line += f" (baseline {baseline[key]:,.1f}, {change:+.1f}%)"
+        lines.append(line)
+    return lines
+
+
+def report(utility, target, results, record=False):
+    """Log results next to the stored baseline; the first run becomes the baseline"""
+    baselines = utility.config.setdefault("net_selftest_baseline", {})
+    baseline = baselines.get(target)
+    for line in compare(results, None if record else baseline):
+        utility.log(line, "RESULT")
+    if record or baseline is None:
+        baselines[target] = results
+        utility.save_config()
+        utility.log(f"Baseline for {target} inscribed", "SUCCESS")
+
+
+def run_loopback(utility):
+    """Loopback self-test ritual"""
+    utility.log("📡 TESTING THE NETWORK STACK ON LOOPBACK", "NETWORK")
+    utility.log(f"Streams: {STREAMS}, {DURATION}s per measurement", "INFO")
+    try:
+        results = run_loopback_selftest()
+    except OSError as e:
+        utility.log(f"Self-test failed: {e}", "ERROR")
+        return False
+    except KeyboardInterrupt:
+        utility.log("Self-test interrupted", "WARNING")
+        return False
+    report(utility, "loopback", results)
+    utility.log("The network stack has been measured", "COMPLETE")
+
+
+def ask_peer(utility):
+    """Ask for the peer host before the ritual is timed; returns (address,) or None"""
+    peer = input("                PEER HOST[:PORT]: ").strip()
+    if not peer:
+        utility.typewriter("❌ No peer host provided", center=True)
+        return None
+    try:
+        return (parse_peer(peer),)
+    except ValueError:
+        utility.log(f"Invalid peer address: {peer}", "ERROR")
+        return None
+
+
+def run_peer(utility, address):
+    """Self-test against a peer host serving this ritual"""
+    utility.log(f"📡 TESTING THE PATH TO {address[0]}:{address[1]}", "NETWORK")
+    try:
+        results = run_selftest(address)
+    except OSError as e:
+        # Includes timeouts from a peer that accepts but never answers
+        utility.log(f"Self-test failed: {e}", "ERROR")
+        return False
+    except KeyboardInterrupt:
+        utility.log("Self-test interrupted", "WARNING")
+        return False
+    report(utility, f"{address[0]}:{address[1]}", results)
+    utility.log("The path has been measured", "COMPLETE")
+
+
+def serve_for_peer(utility):
+    """Serve self-test connections until interrupted"""
+    try:
+        server = SelfTestServer("0.0.0.0", DEFAULT_PORT)
+    except OSError as e:
+        utility.log(f"Could not open port {DEFAULT_PORT}: {e}", "ERROR")
+        return False
+    utility.log(f"📡 Serving self-tests on port {DEFAULT_PORT}", "NETWORK")
+    utility.log("Press Ctrl+C to stop serving", "INFO")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    utility.log("Self-test server closed", "COMPLETE")
+
+
+def record_baseline(utility):
+    """Run the loopback self-test and store it as the new baseline"""
+    utility.log("📡 RECORDING A NEW LOOPBACK BASELINE", "NETWORK")
+    try:
+        results = run_loopback_selftest()
+    except OSError as e:
+        utility.log(f"Self-test failed: {e}", "ERROR")
+        return False
+    except KeyboardInterrupt:
+        utility.log("Self-test interrupted", "WARNING")
+        return False
+    report(utility, "loopback", results, record=True)
+
+
+def main(argv=None):
+    """Standalone entry point"""
+    import argparse
+    parser = argparse.ArgumentParser(description="OPTO network stack self-test")
+    parser.add_argument("--serve", action="store_true", help="serve self-tests for a peer host")
+    parser.add_argument("--bind", default="0.0.0.0", help="address to serve on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port to serve on")
+    parser.add_argument("--peer", help="HOST[:PORT] of a serving peer (default: loopback)")
+    parser.add_argument("--streams", type=int, default=STREAMS, help="parallel throughput streams")
+    parser.add_argument("--duration", type=float, default=DURATION, help="seconds per measurement")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        server = SelfTestServer(args.bind, args.port)
+        print(f"Serving self-tests on {server.address[0]}:{server.address[1]} - Ctrl+C to stop", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+        return 0
+
+    if args.peer:
+        results = run_selftest(parse_peer(args.peer), args.streams, args.duration)
+    else:
+        results = run_loopback_selftest(args.streams, args.duration)
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for line in compare(results, None):
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
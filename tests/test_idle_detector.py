@@ -0,0 +1,59 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from OPTO_System import IdleDetector
+
+
+def sample(t, cpu=5, disk=0, input_idle=120):
+    return {"time": t, "cpu": cpu, "disk": disk, "input_idle": input_idle}
+
+
+def feed(detector, trace):
+    states = []
+    for entry in trace:
+        detector.observe(entry)
+        states.append((detector.is_idle(), detector.is_busy()))
+    return states
+
+
+def make_detector():
+    return IdleDetector(window=10, cpu_percent=20, disk_bytes_per_sec=1000, input_seconds=30)
+
+
+def test_quiet_trace_becomes_idle_after_window():
+    states = feed(make_detector(), [sample(t) for t in (0, 5, 9, 10, 15)])
+    assert [idle for idle, _ in states] == [False, False, False, True, True]
+    assert not any(busy for _, busy in states)
+
+
+def test_spike_resets_window():
+    detector = make_detector()
+    trace = [sample(0), sample(8), sample(9, cpu=80), sample(12), sample(19), sample(22)]
+    states = feed(detector, trace)
+    assert [idle for idle, _ in states] == [False, False, False, False, False, True]
+    assert [busy for _, busy in states] == [False, False, True, False, False, False]
+
+
+def test_disk_and_input_activity_are_busy():
+    detector = make_detector()
+    detector.observe(sample(0, disk=5000))
+    assert detector.is_busy()
+    detector.observe(sample(1, input_idle=2))
+    assert detector.is_busy()
+    assert not detector.is_idle()
+
+
+def test_unknown_input_idle_counts_as_quiet():
+    states = feed(make_detector(), [sample(t, input_idle=None) for t in (0, 5, 10)])
+    assert states[-1] == (True, False)
+
+
+def test_reset_forgets_samples():
+    detector = make_detector()
+    feed(detector, [sample(0), sample(10)])
+    assert detector.is_idle()
+    detector.reset()
+    assert not detector.is_idle()
+    assert not detector.is_busy()
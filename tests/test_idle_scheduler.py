@@ -0,0 +1,197 @@
+import os
+import subprocess
+import sys
+import time
+from collections import namedtuple
+
+import psutil
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+import OPTO_System
+from OPTO_System import HostLoadSampler, OPTOSystemUtility
+
+CpuTimes = namedtuple("CpuTimes", "user idle")
+ProcTimes = namedtuple("ProcTimes", "user system")
+IOCounters = namedtuple("IOCounters", "read_bytes write_bytes")
+
+
+class FakeProcess:
+    def __init__(self, pid, created, cpu=0.0, io_bytes=0):
+        self.pid = pid
+        self.created = created
+        self.cpu = cpu
+        self.io_bytes = io_bytes
+        self.exited = False
+
+    def cpu_times(self):
+        if self.exited:
+            raise psutil.NoSuchProcess(self.pid)
+        return ProcTimes(self.cpu, 0.0)
+
+    def io_counters(self):
+        if self.exited:
+            raise psutil.NoSuchProcess(self.pid)
+        return IOCounters(self.io_bytes, 0)
+
+    def create_time(self):
+        return self.created
+
+
+class FakeHost:
+    """Host-wide counters the sampler reads through psutil"""
+    def __init__(self, monkeypatch):
+        self.now = 100.0
+        self.busy = 0.0
+        self.idle = 0.0
+        self.disk = 0
+        monkeypatch.setattr(OPTO_System.time, "time", lambda: self.now)
+        monkeypatch.setattr(OPTO_System.psutil, "cpu_times", lambda: CpuTimes(self.busy, self.idle))
+        monkeypatch.setattr(OPTO_System.psutil, "disk_io_counters", lambda: IOCounters(self.disk, 0))
+
+    def advance(self, seconds, busy=0.0, disk=0):
+        self.now += seconds
+        self.busy += busy
+        self.idle += seconds - busy
+        self.disk += disk
+
+
+def test_sample_leaves_out_job_load(monkeypatch):
+    host = FakeHost(monkeypatch)
+    sampler = HostLoadSampler()
+    job = FakeProcess(10, created=50.0, cpu=30.0, io_bytes=5000)
+    sampler.sample([job])
+
+    # The job burns 4 of 10 CPU seconds and all of the disk traffic
+    host.advance(10, busy=4, disk=2000)
+    job.cpu += 4
+    job.io_bytes += 2000
+    result = sampler.sample([job])
+    assert result["cpu"] == pytest.approx(0)
+    assert result["disk"] == pytest.approx(0)
+
+    # The user comes back: 3 extra busy seconds and 1000 bytes aren't the job's
+    host.advance(10, busy=5, disk=1500)
+    job.cpu += 2
+    job.io_bytes += 500
+    result = sampler.sample([job])
+    assert result["cpu"] == pytest.approx(30)
+    assert result["disk"] == pytest.approx(100)
+
+
+def test_sample_counts_whole_usage_of_new_child(monkeypatch):
+    host = FakeHost(monkeypatch)
+    sampler = HostLoadSampler()
+    job = FakeProcess(10, created=50.0)
+    sampler.sample([job])
+
+    # A worker spawned mid-interval does all of its work before the next sample
+    host.advance(10, busy=6, disk=4000)
+    child = FakeProcess(11, created=host.now - 5, cpu=6.0, io_bytes=4000)
+    result = sampler.sample([job, child])
+    assert result["cpu"] == pytest.approx(0)
+    assert result["disk"] == pytest.approx(0)
+
+
+def test_sample_baselines_process_seen_late(monkeypatch):
+    host = FakeHost(monkeypatch)
+    sampler = HostLoadSampler()
+    sampler.sample([])
+
+    # Already running before the last sample, so its lifetime usage isn't this interval's
+    host.advance(10, busy=2)
+    job = FakeProcess(10, created=10.0, cpu=500.0, io_bytes=10 ** 9)
+    result = sampler.sample([job])
+    assert result["cpu"] == pytest.approx(20)
+    assert result["disk"] == pytest.approx(0)
+
+
+def test_sample_holds_reading_when_child_exits(monkeypatch):
+    host = FakeHost(monkeypatch)
+    sampler = HostLoadSampler()
+    job = FakeProcess(10, created=50.0)
+    child = FakeProcess(11, created=50.0)
+    sampler.sample([job, child])
+
+    host.advance(10, busy=1)
+    first = sampler.sample([job, child])
+    assert first["cpu"] == pytest.approx(10)
+
+    # The child burns CPU then exits, taking its final counters with it
+    host.advance(10, busy=9)
+    child.exited = True
+    assert sampler.sample([job])["cpu"] == pytest.approx(10)
+
+    # Killed between children() and the read: same hold
+    host.advance(10, busy=9)
+    second = FakeProcess(12, created=host.now - 1)
+    second.exited = True
+    assert sampler.sample([job, second])["cpu"] == pytest.approx(10)
+
+    # With no exits the reading tracks the host again
+    host.advance(10, busy=5)
+    assert sampler.sample([job])["cpu"] == pytest.approx(50)
+
+
+@pytest.fixture
+def child():
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    yield psutil.Process(proc.pid)
+    proc.kill()
+    proc.wait()
+
+
+def test_nice_mode_lowers_and_restores_priority(child):
+    utility = object.__new__(OPTOSystemUtility)
+    original_nice = child.nice()
+    original_ionice = child.ionice() if hasattr(child, "ionice") else None
+    throttled = {}
+    assert utility.throttle_processes([child], throttled, "nice") == 1
+    assert child.pid in throttled
+    assert child.nice() == getattr(psutil, "IDLE_PRIORITY_CLASS", 19)
+    if hasattr(psutil, "IOPRIO_CLASS_IDLE"):
+        assert child.ionice().ioclass == psutil.IOPRIO_CLASS_IDLE
+    # Already throttled processes aren't counted again
+    assert utility.throttle_processes([child], throttled, "nice") == 0
+
+    if hasattr(os, "geteuid") and os.geteuid() != 0:
+        pytest.skip("raising priority back needs root")
+    utility.restore_processes(throttled)
+    assert throttled == {}
+    assert child.nice() == original_nice
+    if original_ionice is not None:
+        assert child.ionice() == original_ionice
+
+
+def test_pause_mode_suspends_and_resumes(child):
+    utility = object.__new__(OPTOSystemUtility)
+    throttled = {}
+    assert utility.throttle_processes([child], throttled, "pause") == 1
+    time.sleep(0.2)
+    assert child.status() == psutil.STATUS_STOPPED
+    utility.restore_processes(throttled)
+    assert throttled == {}
+    time.sleep(0.2)
+    assert child.status() != psutil.STATUS_STOPPED
+
+
+def test_failed_throttle_is_still_restored(child, monkeypatch):
+    utility = object.__new__(OPTOSystemUtility)
+    original_nice = child.nice()
+
+    def fail_ionice(*args):
+        if args:
+            raise psutil.AccessDenied(child.pid)
+        return psutil.Process.ionice(child)
+
+    # nice() goes through, then ionice() is refused: the process must still be tracked
+    monkeypatch.setattr(child, "ionice", fail_ionice)
+    throttled = {}
+    assert utility.throttle_processes([child], throttled, "nice") == 0
+    assert child.pid in throttled
+    monkeypatch.undo()
+    if hasattr(os, "geteuid") and os.geteuid() != 0:
+        pytest.skip("raising priority back needs root")
+    utility.restore_processes(throttled)
+    assert child.nice() == original_nice
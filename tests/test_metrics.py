@@ -0,0 +1,62 @@
+import os
+import sys
+import urllib.error
+import urllib.request
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from OPTO_System import OPTOMetrics
+
+
+@pytest.fixture
+def metrics():
+    metrics = OPTOMetrics(sample_interval=60)
+    address = metrics.start_server("127.0.0.1", 0)
+    metrics.url = f"http://{address[0]}:{address[1]}"
+    yield metrics
+    metrics.stop_server()
+
+
+def scrape(metrics, path="/metrics"):
+    with urllib.request.urlopen(metrics.url + path, timeout=5) as response:
+        assert response.headers["Content-Type"].startswith("text/plain")
+        return response.read().decode("utf-8").splitlines()
+
+
+def test_scrape_reports_counters_and_histogram(metrics):
+    metrics.record_ritual("sfc", 3.0)
+    metrics.record_ritual("sfc", 120.0, "error")
+    metrics.record_command("ipconfig", 1)
+    metrics.record_dns_change("cloudflare")
+
+    lines = scrape(metrics)
+
+    assert 'opto_ritual_runs_total{ritual="sfc",outcome="success"} 1' in lines
+    assert 'opto_ritual_runs_total{ritual="sfc",outcome="error"} 1' in lines
+    assert 'opto_command_exits_total{command="ipconfig",code="1"} 1' in lines
+    assert 'opto_dns_changes_total{mode="cloudflare"} 1' in lines
+    # Buckets are cumulative
+    assert 'opto_ritual_duration_seconds_bucket{ritual="sfc",le="1"} 0' in lines
+    assert 'opto_ritual_duration_seconds_bucket{ritual="sfc",le="5"} 1' in lines
+    assert 'opto_ritual_duration_seconds_bucket{ritual="sfc",le="60"} 1' in lines
+    assert 'opto_ritual_duration_seconds_bucket{ritual="sfc",le="300"} 2' in lines
+    assert 'opto_ritual_duration_seconds_bucket{ritual="sfc",le="+Inf"} 2' in lines
+    assert 'opto_ritual_duration_seconds_count{ritual="sfc"} 2' in lines
+    assert 'opto_ritual_duration_seconds_sum{ritual="sfc"} 123.0' in lines
+
+
+def test_other_paths_are_404(metrics):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        scrape(metrics, "/other")
+    assert error.value.code == 404
+
+
+def test_stop_server_closes_endpoint():
+    metrics = OPTOMetrics(sample_interval=60)
+    address = metrics.start_server("127.0.0.1", 0)
+    metrics.stop_server()
+    assert metrics.server is None
+    with pytest.raises(urllib.error.URLError):
+        urllib.request.urlopen(f"http://{address[0]}:{address[1]}/metrics", timeout=2)
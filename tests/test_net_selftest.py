@@ -0,0 +1,73 @@
+import importlib.util
+import os
+import socket
+import threading
+
+import pytest
+
+PLUGIN = os.path.join(os.path.dirname(__file__), os.pardir, "rituals", "net_selftest.py")
+spec = importlib.util.spec_from_file_location("net_selftest", PLUGIN)
+net_selftest = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(net_selftest)
+
+
+def test_loopback_selftest_reports_all_metrics():
+    server = net_selftest.SelfTestServer("127.0.0.1", 0).start()
+    try:
+        results = net_selftest.run_selftest(server.address, streams=2, duration=0.3)
+    finally:
+        server.close()
+
+    assert set(results) == {key for key, _, _ in net_selftest.METRICS}
+    for value in results.values():
+        assert value > 0
+
+
+def test_silent_peer_times_out(monkeypatch):
+    # Accepts connections but never answers
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(8)
+    accepted = []
+    stop = threading.Event()
+
+    def accept():
+        listener.settimeout(0.1)
+        while not stop.is_set():
+            try:
+                accepted.append(listener.accept()[0])
+            except OSError:
+                continue
+
+    thread = threading.Thread(target=accept, daemon=True)
+    thread.start()
+    monkeypatch.setattr(net_selftest, "TIMEOUT", 0.5)
+    try:
+        with pytest.raises(OSError):
+            net_selftest.measure_round_trips(listener.getsockname(), duration=0.3)
+    finally:
+        stop.set()
+        thread.join()
+        listener.close()
+        for conn in accepted:
+            conn.close()
+
+
+def test_throughput_without_os_sendfile(monkeypatch):
+    # Emulate Windows: no os.sendfile, so socket.sendfile falls back to read+send
+    monkeypatch.delattr(net_selftest.os, "sendfile", raising=False)
+
+    def give_up(self, file, offset=0, count=None):
+        raise socket._GiveupOnSendfile("forced fallback")
+
+    monkeypatch.setattr(socket.socket, "_sendfile_use_sendfile", give_up)
+
+    server = net_selftest.SelfTestServer("127.0.0.1", 0).start()
+    try:
+        chosen = net_selftest.measure_throughput(server.address, streams=2, duration=0.3)
+        forced = net_selftest.measure_throughput(server.address, streams=2, duration=0.3, zero_copy=True)
+    finally:
+        server.close()
+
+    assert chosen > 0
+    assert forced > 0
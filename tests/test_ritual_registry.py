@@ -0,0 +1,129 @@
+import importlib.metadata
+import os
+import sys
+import textwrap
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+
+from OPTO_System import RitualRegistry, RitualSpec
+
+
+def write_plugin(directory, name, body):
+    path = directory / name
+    path.write_text(textwrap.dedent(body), encoding="utf-8")
+    return path
+
+
+def manifest(key, dependencies=(), batch=True):
+    entry = {"key": key, "actions": [{"key": key, "run": "run"}], "dependencies": list(dependencies)}
+    if batch:
+        entry["batch"] = key
+    return entry
+
+
+def test_discovery_does_not_execute_plugin(tmp_path):
+    write_plugin(tmp_path, "explodes.py", """
+        RITUAL = {"key": "explodes", "label": "Explodes", "actions": [{"run": "run"}]}
+        raise RuntimeError("plugin code ran during discovery")
+    """)
+    registry = RitualRegistry()
+    registry.discover(str(tmp_path))
+    assert registry.errors == []
+    assert registry.specs["explodes"].label == "Explodes"
+    assert registry.modules == {}
+
+
+def test_plugin_is_imported_only_on_resolve(tmp_path):
+    marker = tmp_path / "imported.txt"
+    write_plugin(tmp_path, "hello.py", f"""
+        open({str(marker)!r}, "w").close()
+        RITUAL = {{"key": "hello", "actions": [{{"key": "hello", "run": "run"}}]}}
+        def run(utility):
+            utility.append("ran")
+            return True
+    """)
+    registry = RitualRegistry()
+    registry.discover(str(tmp_path))
+    assert not marker.exists()
+
+    spec = registry.specs["hello"]
+    calls = []
+    ritual = registry.resolve(spec, spec.actions[0], calls)
+    assert marker.exists()
+    assert ritual() is True
+    assert calls == ["ran"]
+
+
+def test_broken_manifest_is_reported(tmp_path):
+    write_plugin(tmp_path, "broken.py", "RITUAL = {\n")
+    write_plugin(tmp_path, "_private.py", "raise RuntimeError\n")
+    registry = RitualRegistry()
+    registry.discover(str(tmp_path))
+    assert len(registry.errors) == 1
+    assert registry.errors[0].startswith("broken.py")
+
+
+def test_undeclared_batch_action_is_rejected(tmp_path):
+    bad = {"key": "bad", "actions": [{"key": "go", "run": "run"}], "batch": "missing"}
+    with pytest.raises(ValueError):
+        RitualSpec(bad)
+
+    write_plugin(tmp_path, "bad.py", f"RITUAL = {bad!r}\n")
+    registry = RitualRegistry()
+    registry.discover(str(tmp_path))
+    assert "bad" not in registry.specs
+    assert registry.errors and registry.errors[0].startswith("bad.py")
+
+
+def test_batch_order_runs_dependencies_first():
+    registry = RitualRegistry()
+    registry.register(RitualSpec(manifest("dns", ["network"])))
+    registry.register(RitualSpec(manifest("sfc")))
+    registry.register(RitualSpec(manifest("network", ["flush"])))
+    registry.register(RitualSpec(manifest("flush")))
+    registry.register(RitualSpec(manifest("menu_only", batch=False)))
+    # Unknown dependencies are ignored
+    registry.register(RitualSpec(manifest("extra", ["not_installed"])))
+
+    order = [spec.key for spec in registry.batch_order()]
+    assert order == ["sfc", "flush", "network", "dns", "extra"]
+
+
+def test_batch_order_survives_cycles():
+    registry = RitualRegistry()
+    registry.register(RitualSpec(manifest("a", ["b"])))
+    registry.register(RitualSpec(manifest("b", ["a"])))
+    registry.register(RitualSpec(manifest("c", ["a"])))
+
+    order = [spec.key for spec in registry.batch_order()]
+    assert sorted(order) == ["a", "b", "c"]
+    assert order.index("c") > order.index("a")
+
+
+def test_entry_point_plugin_found_without_importing_package(tmp_path, monkeypatch):
+    package = tmp_path / "optopkg"
+    (package / "rituals").mkdir(parents=True)
+    write_plugin(package, "__init__.py", "raise RuntimeError('package imported')\n")
+    write_plugin(package / "rituals", "__init__.py", "raise RuntimeError('subpackage imported')\n")
+    write_plugin(package / "rituals", "hello.py", """
+        CUSTOM = {"key": "packaged", "actions": [{"run": "run"}]}
+    """)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    class EntryPoint:
+        name = "packaged"
+        value = "optopkg.rituals.hello:CUSTOM"
+
+    class EntryPoints(list):
+        def select(self, group):
+            return [ep for ep in self if group == RitualRegistry.ENTRY_POINT_GROUP]
+
+    monkeypatch.setattr(importlib.metadata, "entry_points", lambda: EntryPoints([EntryPoint()]))
+
+    registry = RitualRegistry()
+    registry.discover(str(tmp_path / "no_plugins_dir"))
+    assert registry.errors == []
+    assert registry.specs["packaged"].source == ("module", "optopkg.rituals.hello")
+    assert "optopkg" not in sys.modules